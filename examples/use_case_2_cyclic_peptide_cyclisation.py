@@ -13,188 +13,22 @@ Reference: https://doi.org/10.1021/acs.jctc.2c00075
 """
 
 import argparse
+import mmap
+import os
+import re
 import subprocess
 import sys
+from collections import deque
 from pathlib import Path
-import shutil
-import tempfile
 
+# Cyclisation templates and the HADDOCK3 launcher are shared with
+# scripts/cyclic_peptide_cyclisation.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.cyclisation import render_config, write_restraints
+from scripts.lib.haddock import haddock3_command
 
-def create_distance_restraints(peptide_length, output_file):
-    """
-    Create distance restraints to bring N and C termini together for cyclisation.
-
-    Args:
-        peptide_length (int): Length of the peptide
-        output_file (str): Path to output restraints file
-    """
-    restraints = f"""!
-! Distance restraints for peptide cyclisation
-! These restraints bring the N and C termini together
-!
-! N-terminus (residue 1) to C-terminus (residue {peptide_length})
-assign (segid B and resid 1 and name N) (segid B and resid {peptide_length} and name C) 1.4 0.2 0.2
-assign (segid B and resid 1 and name CA) (segid B and resid {peptide_length} and name CA) 2.5 0.5 0.5
-assign (segid B and resid 1 and name CB) (segid B and resid {peptide_length} and name CB) 3.5 1.0 1.0
-"""
-    with open(output_file, 'w') as f:
-        f.write(restraints)
-
-
-def create_cyclisation_config(peptide_pdb, peptide_length, output_dir, ncores=4):
-    """
-    Create a HADDOCK3 configuration file for peptide cyclisation.
-
-    Args:
-        peptide_pdb (str): Path to peptide PDB file
-        peptide_length (int): Number of residues in the peptide
-        output_dir (str): Output directory name
-        ncores (int): Number of CPU cores to use
-
-    Returns:
-        str: Configuration file content
-    """
-    config = f"""# ==================================================
-#      Peptide cyclisation protocol with HADDOCK3
-#
-#  This example workflow will take a peptide
-#  and generate cyclised conformations in a two step
-#  process, first using distance restraints to bring the
-#  termini together, then rebuilding the topology to
-#  create the covalent cyclic bond and refining again.
-#
-#  Protocol described in: https://doi.org/10.1021/acs.jctc.2c00075
-# ==================================================
-
-run_dir = "{output_dir}"
-
-# execution mode
-mode = "local"
-ncores = {ncores}
-debug = false
-concat = 1
-
-# input peptide structure
-molecules = [
-    "{peptide_pdb}",
-    ]
-
-# ==================================================
-
-# Generate initial topology
-[topoaa]
-
-# First refinement: bring termini together using distance restraints
-[flexref]
-unambig_fname = "cyclisation_restraints.tbl"
-tolerance = 5
-sampling_factor = 10
-tadfactor = 4
-mdsteps_rigid = 2000
-mdsteps_cool1 = 2000
-mdsteps_cool2 = 4000
-mdsteps_cool3 = 4000
-# Give full flexibility to the peptide
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-# Turn off electrostatic for initial cyclisation
-elecflag = false
-
-# MD refinement to relax the structure
-[mdref]
-unambig_fname = "cyclisation_restraints.tbl"
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-
-# Evaluate intermediate structures
-[caprieval]
-
-# Calculate RMSD matrix for clustering
-[rmsdmatrix]
-
-# Cluster based on RMSD
-[clustrmsd]
-criterion = "maxclust"  # Use maximum number of clusters
-n_clusters = 50  # Number of desired clusters
-min_population = 1  # Include singletons
-plot_matrix = true  # Plot the RMSD matrix
-
-# Select top clusters
-[seletopclusts]
-top_clusters = 50
-top_models = 1
-
-# Evaluate clustered structures
-[caprieval]
-
-# SECOND STAGE: Create actual covalent bond and refine
-# Rebuild topology with cyclic bond
-[topoaa]
-cyclicpept_dist = 3.5
-disulphide_dist = 4.0
-[topoaa.mol1]
-cyclicpept = true
-
-# Scoring to accept new topology
-[emscoring]
-# Required to make the next module accept the new PDB files
-# after calling topoaa a second time
-
-# Final flexible refinement with covalent bond
-[flexref]
-unambig_fname = "cyclisation_restraints.tbl"
-tolerance = 5
-sampling_factor = 1
-tadfactor = 4
-mdsteps_rigid = 2000
-mdsteps_cool1 = 2000
-mdsteps_cool2 = 4000
-mdsteps_cool3 = 4000
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-# Turn off electrostatic for final refinement
-elecflag = false
-
-# Final MD refinement in explicit water
-[mdref]
-watersteps = 5000
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-
-# Final evaluation
-[caprieval]
-
-# Final clustering
-[rmsdmatrix]
-
-[clustrmsd]
-criterion = "maxclust"  # Use maximum number of clusters
-n_clusters = 50  # Number of desired clusters
-min_population = 1  # Include singletons
-plot_matrix = true  # Plot the RMSD matrix
-
-# Select final top models
-[seletopclusts]
-top_clusters = 50
-top_models = 1
-
-# Final evaluation
-[caprieval]
-
-# ==================================================
-"""
-    return config
+# ATOM records whose atom name (columns 13-16) is CA; captures resSeq (columns 23-26)
+_CA_RE = re.compile(rb'^ATOM.{8}(?:CA  | CA |  CA).{6}(.{4})', re.MULTILINE)
 
 
 def estimate_peptide_length(pdb_file):
@@ -208,18 +42,18 @@ def estimate_peptide_length(pdb_file):
         int: Number of residues
     """
     try:
-        with open(pdb_file, 'r') as f:
-            residues = set()
-            for line in f:
-                if line.startswith("ATOM") and line[12:16].strip() == "CA":
-                    resnum = int(line[22:26].strip())
-                    residues.add(resnum)
+        with open(pdb_file, 'rb') as f:
+            # mmap cannot map an empty file; an empty PDB simply has no residues
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                residues = {int(m.group(1)) for m in _CA_RE.finditer(mm)}
         return len(residues)
     except Exception:
         return 14  # Default for demo peptide
 
 
-def run_haddock3(config_file, work_dir, peptide_length):
+def run_haddock3(config_file, work_dir, peptide_length, output_dir):
     """
     Execute HADDOCK3 cyclisation with the given configuration file.
 
@@ -227,6 +61,7 @@ def run_haddock3(config_file, work_dir, peptide_length):
         config_file (str): Path to configuration file
         work_dir (str): Working directory
         peptide_length (int): Length of peptide for restraints
+        output_dir (str): The config's run_dir, created by HADDOCK3 inside work_dir
 
     Returns:
         tuple: (success, output_dir)
@@ -234,37 +69,42 @@ def run_haddock3(config_file, work_dir, peptide_length):
     try:
         # Create restraints file in work directory
         restraints_file = Path(work_dir) / "cyclisation_restraints.tbl"
-        create_distance_restraints(peptide_length, restraints_file)
+        write_restraints(peptide_length, restraints_file)
 
-        original_dir = Path.cwd()
         Path(work_dir).mkdir(exist_ok=True)
 
         print(f"Running HADDOCK3 cyclisation with configuration: {config_file}")
         print("This may take 30 minutes to several hours...")
 
-        # Run HADDOCK3
-        result = subprocess.run([
-            "mamba", "run", "-p", str(original_dir / "env"),
-            "haddock3", str(config_file)
-        ],
-        cwd=work_dir,
-        capture_output=True,
-        text=True,
-        timeout=7200  # 2 hour timeout
-        )
+        command, env = haddock3_command()
+
+        # Run HADDOCK3 with its output going straight to a log file; no pipe to drain
+        log_file = Path(work_dir) / "haddock3.log"
+        with open(log_file, 'wb') as log_fh:
+            result = subprocess.run([
+                *command, str(config_file)
+            ],
+            cwd=work_dir,
+            env=env,
+            stdout=log_fh,
+            stderr=subprocess.STDOUT,
+            timeout=7200  # 2 hour timeout
+            )
 
         if result.returncode == 0:
             print("HADDOCK3 cyclisation completed successfully!")
-            # Find the output directory
-            run_dirs = [d for d in Path(work_dir).iterdir() if d.is_dir() and d.name.startswith("run")]
-            if run_dirs:
-                output_dir = run_dirs[0]
-                print(f"Cyclic peptide structures available in: {output_dir}")
-                return True, output_dir
+            # HADDOCK3 writes into the run_dir named in the config
+            run_dir = Path(work_dir) / output_dir
+            if run_dir.is_dir():
+                print(f"Cyclic peptide structures available in: {run_dir}")
+                return True, run_dir
+            print(f"Expected output directory not found: {run_dir}")
+            return False, None
         else:
             print("HADDOCK3 cyclisation failed!")
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
+            with open(log_file, errors="replace") as f:
+                print("OUTPUT (last 50 lines):", "".join(deque(f, maxlen=50)))
+            print(f"Full log: {log_file}")
             return False, None
 
     except subprocess.TimeoutExpired:
@@ -339,16 +179,15 @@ peptides, you may need additional restraints.
     work_dir.mkdir(exist_ok=True)
 
     # Generate configuration file
-    config_content = create_cyclisation_config(
+    config_content = render_config(
         peptide_pdb=str(peptide_path.resolve()),
         peptide_length=peptide_length,
         output_dir=args.output,
-        ncores=args.ncores
+        config={"ncores": args.ncores}
     )
 
     config_file = work_dir / "cyclisation_config.cfg"
-    with open(config_file, 'w') as f:
-        f.write(config_content)
+    config_file.write_text(config_content)
 
     print(f"Configuration file created: {config_file}")
 
@@ -358,7 +197,7 @@ peptides, you may need additional restraints.
         return 0
 
     # Run HADDOCK3
-    success, output_dir = run_haddock3(config_file, work_dir, peptide_length)
+    success, output_dir = run_haddock3(config_file, work_dir, peptide_length, args.output)
 
     if success:
         print(f"\\n🎉 Peptide cyclisation completed successfully!")
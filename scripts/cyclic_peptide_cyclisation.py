@@ -17,19 +17,34 @@ Example:
 # Minimal Imports (only essential packages)
 # ==============================================================================
 import argparse
+import functools
+import math
+import os
 import subprocess
 import sys
+from collections import ChainMap, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import tempfile
-from typing import Union, Optional, Dict, Any, List, Tuple
-import json
+from typing import Union, Optional, Dict, Any, List, Mapping, Tuple
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; used only to count physical cores
+    psutil = None
+
+# Shared cyclisation templates, PDB parser and HADDOCK3 launcher. Imported as scripts.lib (the
+# same name the examples and the MCP server use) so there is only one copy of each module.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lib.cyclisation import CyclisationConfig, render_config, write_restraints
+from scripts.lib import validation
+from scripts.lib.haddock import haddock3_command
 
 # ==============================================================================
 # Configuration (extracted from use case)
 # ==============================================================================
 DEFAULT_CONFIG = {
     "ncores": 4,
-    "timeout": 3600,  # 1 hour
+    "timeout": "auto",  # seconds, or "auto" to scale with peptide length and MD steps
     "tolerance": 5,
     "sampling_factor": 10,
     "tadfactor": 4,
@@ -55,245 +70,103 @@ DEFAULT_CONFIG = {
 # ==============================================================================
 # Inlined Utility Functions (simplified from use case)
 # ==============================================================================
-def create_distance_restraints(peptide_length: int, output_file: Path) -> None:
-    """
-    Create distance restraints to bring N and C termini together for cyclisation.
-    Simplified from examples/use_case_2_cyclic_peptide_cyclisation.py
+# Watchdog budget for "auto" timeouts: fixed overhead plus seconds per residue-MD-step
+# per round of models. This is a ceiling for killing hung runs, not a runtime
+# prediction: the per-step rate is calibrated so the default protocol (4 cores,
+# sampling_factor 10, 12000 MD steps) on the 14-residue 1sfi example gets ~3600 s,
+# the fixed timeout used before "auto" existed, and other inputs scale from there.
+_TIMEOUT_BASE = 600
+_TIMEOUT_PER_RESIDUE_STEP = 0.0045
+
+def estimate_timeout(peptide_length: int, config: Mapping[str, Any]) -> int:
     """
-    restraints = f"""!
-! Distance restraints for peptide cyclisation
-! These restraints bring the N and C termini together
-!
-! N-terminus (residue 1) to C-terminus (residue {peptide_length})
-assign (segid B and resid 1 and name N) (segid B and resid {peptide_length} and name C) 1.4 0.2 0.2
-assign (segid B and resid 1 and name CA) (segid B and resid {peptide_length} and name CA) 2.5 0.5 0.5
-assign (segid B and resid 1 and name CB) (segid B and resid {peptide_length} and name CB) 3.5 1.0 1.0
-"""
-    with open(output_file, 'w') as f:
-        f.write(restraints)
+    Estimate a HADDOCK3 timeout (seconds) from peptide length, sampling and cores.
 
-def create_cyclisation_config(peptide_pdb: str, peptide_length: int, output_dir: str,
-                             config: Dict[str, Any]) -> str:
+    Work scales with residues x MD steps per refinement. The first flexref stage
+    refines sampling_factor models, ncores at a time, and the second adds one
+    more round; fewer cores therefore means proportionally more wall time.
     """
-    Create a HADDOCK3 configuration file for peptide cyclisation.
-    Simplified from examples/use_case_2_cyclic_peptide_cyclisation.py
+    cfg = CyclisationConfig.from_dict(config)
+    md_steps = cfg.md_rigid + cfg.md_cool1 + cfg.md_cool2 + cfg.md_cool3
+    rounds = math.ceil(cfg.sampling_factor / max(1, cfg.ncores)) + 1
+    return int(_TIMEOUT_BASE + _TIMEOUT_PER_RESIDUE_STEP * peptide_length * md_steps * rounds)
+
+def get_peptide_length_from_pdb(pdb_file: Path, st: Optional[os.stat_result] = None) -> int:
+    """Extract peptide length from PDB file by counting residues (st: reuse a prior stat)."""
+    if st is None:
+        try:
+            st = os.stat(pdb_file)
+        except OSError as e:
+            raise ValueError(f"Error reading PDB file {pdb_file}: {e}")
+    return _cached_peptide_length(str(pdb_file), st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=1024)
+def _cached_peptide_length(pdb_file: str, mtime_ns: int, size: int) -> int:
+    """Parse once per file version; mtime/size in the key invalidate edited files."""
+    return validation.get_peptide_length_from_pdb(pdb_file)
+
+def validate_input_file(file_path: Path, file_type: str) -> os.stat_result:
+    """
+    Validate that input file exists, is non-empty and has correct format.
+    Returns the file's stat result so callers can reuse it.
     """
-    ncores = config.get("ncores", 4)
-    tolerance = config.get("tolerance", 5)
-    sampling_factor = config.get("sampling_factor", 10)
-    tadfactor = config.get("tadfactor", 4)
-    md = config.get("md_steps", {})
-    cluster = config.get("clustering", {})
-    cyclic = config.get("cyclisation", {})
-    water_steps = config.get("water_steps", 5000)
-
-    return f"""# ==================================================
-#      Peptide cyclisation protocol with HADDOCK3
-#
-#  This example workflow will take a peptide
-#  and generate cyclised conformations in a two step
-#  process, first using distance restraints to bring the
-#  termini together, then rebuilding the topology to
-#  create the covalent cyclic bond and refining again.
-#
-#  Protocol described in: https://doi.org/10.1021/acs.jctc.2c00075
-# ==================================================
-
-run_dir = "{output_dir}"
-
-# execution mode
-mode = "local"
-ncores = {ncores}
-debug = false
-concat = 1
-
-# input peptide structure
-molecules = [
-    "{peptide_pdb}",
-    ]
-
-# ==================================================
-
-# Generate initial topology
-[topoaa]
-
-# First refinement: bring termini together using distance restraints
-[flexref]
-unambig_fname = "cyclisation_restraints.tbl"
-tolerance = {tolerance}
-sampling_factor = {sampling_factor}
-tadfactor = {tadfactor}
-mdsteps_rigid = {md.get("rigid", 2000)}
-mdsteps_cool1 = {md.get("cool1", 2000)}
-mdsteps_cool2 = {md.get("cool2", 4000)}
-mdsteps_cool3 = {md.get("cool3", 4000)}
-# Give full flexibility to the peptide
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-# Turn off electrostatic for initial cyclisation
-elecflag = false
-
-# MD refinement to relax the structure
-[mdref]
-unambig_fname = "cyclisation_restraints.tbl"
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-
-# Evaluate intermediate structures
-[caprieval]
-
-# Calculate RMSD matrix for clustering
-[rmsdmatrix]
-
-# Cluster based on RMSD
-[clustrmsd]
-criterion = "maxclust"  # Use maximum number of clusters
-n_clusters = {cluster.get("n_clusters", 50)}  # Number of desired clusters
-min_population = {cluster.get("min_population", 1)}  # Include singletons
-plot_matrix = true  # Plot the RMSD matrix
-
-# Select top clusters
-[seletopclusts]
-top_clusters = {cluster.get("top_clusters", 50)}
-top_models = {cluster.get("top_models", 1)}
-
-# Evaluate clustered structures
-[caprieval]
-
-# SECOND STAGE: Create actual covalent bond and refine
-# Rebuild topology with cyclic bond
-[topoaa]
-cyclicpept_dist = {cyclic.get("distance", 3.5)}
-disulphide_dist = {cyclic.get("disulphide_distance", 4.0)}
-[topoaa.mol1]
-cyclicpept = true
-
-# Scoring to accept new topology
-[emscoring]
-# Required to make the next module accept the new PDB files
-# after calling topoaa a second time
-
-# Final flexible refinement with covalent bond
-[flexref]
-unambig_fname = "cyclisation_restraints.tbl"
-tolerance = {tolerance}
-sampling_factor = 1
-tadfactor = {tadfactor}
-mdsteps_rigid = {md.get("rigid", 2000)}
-mdsteps_cool1 = {md.get("cool1", 2000)}
-mdsteps_cool2 = {md.get("cool2", 4000)}
-mdsteps_cool3 = {md.get("cool3", 4000)}
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-# Turn off electrostatic for final refinement
-elecflag = false
-
-# Final MD refinement in explicit water
-[mdref]
-watersteps = {water_steps}
-# Keep peptide fully flexible
-nfle = 1
-fle_sta_1 = 1
-fle_end_1 = {peptide_length}
-fle_seg_1 = "B"
-
-# Final evaluation
-[caprieval]
-
-# Final clustering
-[rmsdmatrix]
-
-[clustrmsd]
-criterion = "maxclust"  # Use maximum number of clusters
-n_clusters = {cluster.get("n_clusters", 50)}  # Number of desired clusters
-min_population = {cluster.get("min_population", 1)}  # Include singletons
-plot_matrix = true  # Plot the RMSD matrix
-
-# Select final top models
-[seletopclusts]
-top_clusters = {cluster.get("top_clusters", 50)}
-top_models = {cluster.get("top_models", 1)}
-
-# Final evaluation
-[caprieval]
-
-# ==================================================
-"""
-
-def get_peptide_length_from_pdb(pdb_file: Path) -> int:
-    """Extract peptide length from PDB file by counting residues."""
     try:
-        residue_numbers = set()
-        with open(pdb_file, 'r') as f:
-            for line in f:
-                if line.startswith(('ATOM', 'HETATM')):
-                    # Extract residue number (columns 23-26)
-                    try:
-                        res_num = int(line[22:26].strip())
-                        residue_numbers.add(res_num)
-                    except ValueError:
-                        continue
-
-        if residue_numbers:
-            return max(residue_numbers)
-        else:
-            raise ValueError("No valid residues found in PDB file")
-    except Exception as e:
-        raise ValueError(f"Error reading PDB file {pdb_file}: {e}")
-
-def validate_input_file(file_path: Path, file_type: str) -> bool:
-    """Validate that input file exists and has correct format."""
-    if not file_path.exists():
+        st = os.stat(file_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"{file_type} file not found: {file_path}")
 
-    if file_type == "pdb" and not file_path.suffix.lower() == ".pdb":
+    if st.st_size == 0:
+        raise ValueError(f"Empty {file_type} file: {file_path}")
+
+    if file_type == "pdb" and not str(file_path).lower().endswith(".pdb"):
         raise ValueError(f"Expected PDB file, got: {file_path.suffix}")
 
-    return True
+    return st
 
-def run_haddock3(config_file: Path, work_dir: Path, timeout: int = 3600) -> Tuple[bool, Optional[Path]]:
-    """Execute HADDOCK3 with the given configuration. Simplified from use case."""
+def _physical_core_count() -> int:
+    """Number of physical CPU cores (logical count when psutil is unavailable)."""
+    cores = psutil.cpu_count(logical=False) if psutil is not None else None
+    return cores or os.cpu_count() or 4
+
+def run_haddock3(config_file: Path, work_dir: Path, output_dir: str,
+                 timeout: int = 3600) -> Tuple[bool, Optional[Path]]:
+    """
+    Execute HADDOCK3 with the given configuration. Simplified from use case.
+    output_dir is the config's run_dir, which HADDOCK3 creates inside work_dir.
+    """
     try:
         print(f"Running HADDOCK3 with configuration: {config_file}")
         print("This may take several minutes to hours depending on the system size...")
 
-        # Find environment path
-        env_path = Path.cwd() / "env"
-        if not env_path.exists():
-            # Try relative to script
-            env_path = Path(__file__).parent.parent / "env"
-
-        # Run HADDOCK3
-        result = subprocess.run([
-            "mamba", "run", "-p", str(env_path),
-            "haddock3", str(config_file)
-        ],
-        cwd=work_dir,
-        capture_output=True,
-        text=True,
-        timeout=timeout
-        )
+        command, env = haddock3_command()
+
+        # Run HADDOCK3 with its output going straight to a log file; no pipe to drain
+        log_file = work_dir / "haddock3.log"
+        with open(log_file, 'wb') as log_fh:
+            result = subprocess.run([
+                *command, str(config_file)
+            ],
+            cwd=work_dir,
+            env=env,
+            stdout=log_fh,
+            stderr=subprocess.STDOUT,
+            timeout=timeout
+            )
 
         if result.returncode == 0:
             print("HADDOCK3 completed successfully!")
-            # Find the output directory
-            run_dirs = [d for d in work_dir.iterdir() if d.is_dir() and d.name.startswith("run")]
-            if run_dirs:
-                output_dir = run_dirs[0]  # Take the first run directory
-                print(f"Results available in: {output_dir}")
-                return True, output_dir
+            # HADDOCK3 writes into the run_dir named in the config
+            run_dir = work_dir / output_dir
+            if run_dir.is_dir():
+                print(f"Results available in: {run_dir}")
+                return True, run_dir
+            print(f"Expected output directory not found: {run_dir}")
+            return False, None
         else:
             print("HADDOCK3 failed!")
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
+            with open(log_file, errors="replace") as f:
+                print("OUTPUT (last 50 lines):", "".join(deque(f, maxlen=50)))
+            print(f"Full log: {log_file}")
             return False, None
 
     except subprocess.TimeoutExpired:
@@ -343,7 +216,16 @@ def run_cyclic_peptide_cyclisation(
     """
     # Setup
     peptide_file = Path(peptide_file)
-    config = {**DEFAULT_CONFIG, **(config or {}), **kwargs}
+    # Layered lookup (kwargs > config > defaults); no merged dict is built per call
+    config = ChainMap(kwargs, config or {}, DEFAULT_CONFIG)
+
+    # HADDOCK3 stops scaling past the physical cores; trim oversubscribed requests.
+    # Dry runs are left alone since their config may be executed on another machine.
+    physical_cores = _physical_core_count()
+    if not dry_run and config["ncores"] > physical_cores:
+        print(f"Warning: ncores={config['ncores']} exceeds the {physical_cores} physical "
+              f"cores available; using ncores={physical_cores}")
+        config["ncores"] = physical_cores
 
     if output_dir is None:
         output_dir = "cyclic_peptide_cyclisation"
@@ -354,11 +236,11 @@ def run_cyclic_peptide_cyclisation(
         work_dir = Path(work_dir)
 
     # Validate inputs
-    validate_input_file(peptide_file, "peptide")
+    peptide_stat = validate_input_file(peptide_file, "peptide")
 
     # Auto-detect peptide length if not provided
     if peptide_length is None:
-        peptide_length = get_peptide_length_from_pdb(peptide_file)
+        peptide_length = get_peptide_length_from_pdb(peptide_file, peptide_stat)
         print(f"Auto-detected peptide length: {peptide_length} residues")
 
     # Create working directory
@@ -366,10 +248,10 @@ def run_cyclic_peptide_cyclisation(
 
     # Create distance restraints file
     restraints_file = work_dir / "cyclisation_restraints.tbl"
-    create_distance_restraints(peptide_length, restraints_file)
+    write_restraints(peptide_length, restraints_file)
 
     # Generate configuration file
-    config_content = create_cyclisation_config(
+    config_content = render_config(
         peptide_pdb=str(peptide_file.resolve()),
         peptide_length=peptide_length,
         output_dir=output_dir,
@@ -377,8 +259,7 @@ def run_cyclic_peptide_cyclisation(
     )
 
     config_file = work_dir / "cyclisation_config.cfg"
-    with open(config_file, 'w') as f:
-        f.write(config_content)
+    config_file.write_text(config_content)
 
     result = {
         "success": False,
@@ -389,7 +270,7 @@ def run_cyclic_peptide_cyclisation(
         "peptide_length": peptide_length,
         "metadata": {
             "peptide_file": str(peptide_file),
-            "config": config,
+            "config": dict(config),
             "dry_run": dry_run
         }
     }
@@ -403,7 +284,11 @@ def run_cyclic_peptide_cyclisation(
         return result
 
     # Run HADDOCK3
-    success, output_path = run_haddock3(config_file, work_dir, config.get("timeout", 3600))
+    timeout = config.get("timeout", "auto")
+    if timeout == "auto":
+        timeout = estimate_timeout(peptide_length, config)
+        print(f"Using estimated timeout: {timeout} seconds")
+    success, output_path = run_haddock3(config_file, work_dir, str(output_dir), timeout)
 
     result["success"] = success
     if success and output_path:
@@ -411,9 +296,89 @@ def run_cyclic_peptide_cyclisation(
 
     return result
 
+def run_cyclic_peptide_cyclisation_batch(
+    peptide_files: List[Union[str, Path]],
+    max_parallel: int = 4,
+    work_dir: Optional[Union[str, Path]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Cyclise several linear peptides, running up to max_parallel HADDOCK3 jobs at once.
+
+    Each peptide gets its own working directory (<work_dir>/<index>_<peptide stem>,
+    so inputs sharing a file name never share a directory) and
+    the configured ncores (capped at the physical core count) is split across
+    the concurrent jobs so the total load stays close to what a single run would use.
+
+    Args:
+        peptide_files: Paths to linear peptide PDB files
+        max_parallel: Maximum number of concurrent HADDOCK3 runs
+        work_dir: Base working directory (default: ./cyclisation_work)
+        config: Configuration dict shared by all jobs
+        **kwargs: Passed through to run_cyclic_peptide_cyclisation
+
+    Returns:
+        List of result dicts, in the same order as peptide_files. Jobs that
+        raise are reported with success=False and an error message.
+
+    Raises:
+        ValueError: If max_parallel is less than 1
+
+    Example:
+        >>> results = run_cyclic_peptide_cyclisation_batch(["pep1.pdb", "pep2.pdb"], max_parallel=2)
+    """
+    if max_parallel < 1:
+        raise ValueError(f"max_parallel must be at least 1, got {max_parallel}")
+
+    base_dir = Path(work_dir) if work_dir is not None else Path("./cyclisation_work")
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    merged = ChainMap(kwargs, config or {}, DEFAULT_CONFIG)
+    total_cores = merged["ncores"]
+    if not kwargs.get("dry_run"):
+        total_cores = min(total_cores, _physical_core_count())
+    kwargs["ncores"] = max(1, total_cores // max_parallel)
+
+    with ProcessPoolExecutor(max_workers=max_parallel) as executor:
+        futures = [
+            executor.submit(
+                run_cyclic_peptide_cyclisation,
+                peptide_file,
+                work_dir=base_dir / f"{i}_{Path(peptide_file).stem}",
+                config=config,
+                **kwargs
+            )
+            for i, peptide_file in enumerate(peptide_files)
+        ]
+
+        results = []
+        for peptide_file, future in zip(peptide_files, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({
+                    "success": False,
+                    "error": str(e),
+                    "metadata": {"peptide_file": str(peptide_file)}
+                })
+        return results
+
 # ==============================================================================
 # CLI Interface
 # ==============================================================================
+def _timeout_arg(value: str) -> Union[int, str]:
+    """argparse type for --timeout: a positive number of seconds or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        seconds = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected seconds or 'auto', got {value!r}")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"timeout must be positive, got {seconds}")
+    return seconds
+
 def main():
     parser = argparse.ArgumentParser(
         description=__doc__,
@@ -431,6 +396,8 @@ def main():
                        help='Working directory for HADDOCK3')
     parser.add_argument('--ncores', type=int,
                        help='Number of CPU cores to use')
+    parser.add_argument('--timeout', type=_timeout_arg,
+                       help='HADDOCK3 timeout in seconds, or "auto" to estimate from peptide size')
     parser.add_argument('--dry-run', action="store_true",
                        help='Only create configuration file, dont run HADDOCK3')
 
@@ -439,13 +406,19 @@ def main():
     # Load config if provided
     config = None
     if args.config:
-        with open(args.config) as f:
-            config = json.load(f)
+        # Imported here: only the CLI config path needs a JSON parser
+        try:
+            import orjson as _json
+        except ImportError:  # orjson is optional; stdlib json.loads also accepts bytes
+            import json as _json
+        config = _json.loads(Path(args.config).read_bytes())
 
     # Override config with CLI arguments
     cli_overrides = {}
     if args.ncores:
         cli_overrides["ncores"] = args.ncores
+    if args.timeout:
+        cli_overrides["timeout"] = args.timeout
 
     # Run
     try:
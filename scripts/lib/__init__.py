@@ -11,6 +11,7 @@ __author__ = "HADDOCK3 MCP Tool"
 from .haddock import run_haddock3, find_haddock_env
 from .validation import validate_input_file, validate_pdb_format
 from .utils import parse_residue_list, create_work_directory
+from .cyclisation import CyclisationConfig, render_config, write_restraints
 
 __all__ = [
     "run_haddock3",
@@ -18,5 +19,8 @@ __all__ = [
     "validate_input_file",
     "validate_pdb_format",
     "parse_residue_list",
-    "create_work_directory"
+    "create_work_directory",
+    "CyclisationConfig",
+    "render_config",
+    "write_restraints"
 ]
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Cyclisation helpers shared by the cyclic peptide script and use case.
+
+Renders the HADDOCK3 two-stage cyclisation workflow and the N/C-termini
+distance restraints it depends on.
+"""
+
+import functools
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Mapping, Union
+
+
+# HADDOCK3 cyclisation workflow, rendered with str.format by _render_config
+_CYCLISATION_CONFIG_TEMPLATE = """# ==================================================
+#      Peptide cyclisation protocol with HADDOCK3
+#
+#  This example workflow will take a peptide
+#  and generate cyclised conformations in a two step
+#  process, first using distance restraints to bring the
+#  termini together, then rebuilding the topology to
+#  create the covalent cyclic bond and refining again.
+#
+#  Protocol described in: https://doi.org/10.1021/acs.jctc.2c00075
+# ==================================================
+
+run_dir = "{output_dir}"
+
+# execution mode
+mode = "local"
+ncores = {ncores}
+debug = false
+concat = 1
+
+# input peptide structure
+molecules = [
+    "{peptide_pdb}",
+    ]
+
+# ==================================================
+
+# Generate initial topology
+[topoaa]
+
+# First refinement: bring termini together using distance restraints
+[flexref]
+unambig_fname = "cyclisation_restraints.tbl"
+tolerance = {tolerance}
+sampling_factor = {sampling_factor}
+tadfactor = {tadfactor}
+mdsteps_rigid = {md_rigid}
+mdsteps_cool1 = {md_cool1}
+mdsteps_cool2 = {md_cool2}
+mdsteps_cool3 = {md_cool3}
+# Give full flexibility to the peptide
+nfle = 1
+fle_sta_1 = 1
+fle_end_1 = {peptide_length}
+fle_seg_1 = "B"
+# Turn off electrostatic for initial cyclisation
+elecflag = false
+
+# MD refinement to relax the structure
+[mdref]
+unambig_fname = "cyclisation_restraints.tbl"
+# Keep peptide fully flexible
+nfle = 1
+fle_sta_1 = 1
+fle_end_1 = {peptide_length}
+fle_seg_1 = "B"
+
+# Evaluate intermediate structures
+[caprieval]
+
+# Calculate RMSD matrix for clustering
+[rmsdmatrix]
+
+# Cluster based on RMSD
+[clustrmsd]
+criterion = "maxclust"  # Use maximum number of clusters
+n_clusters = {n_clusters}  # Number of desired clusters
+min_population = {min_population}  # Include singletons
+plot_matrix = true  # Plot the RMSD matrix
+
+# Select top clusters
+[seletopclusts]
+top_clusters = {top_clusters}
+top_models = {top_models}
+
+# Evaluate clustered structures
+[caprieval]
+
+# SECOND STAGE: Create actual covalent bond and refine
+# Rebuild topology with cyclic bond
+[topoaa]
+cyclicpept_dist = {cyclic_distance}
+disulphide_dist = {disulphide_distance}
+[topoaa.mol1]
+cyclicpept = true
+
+# Scoring to accept new topology
+[emscoring]
+# Required to make the next module accept the new PDB files
+# after calling topoaa a second time
+
+# Final flexible refinement with covalent bond
+[flexref]
+unambig_fname = "cyclisation_restraints.tbl"
+tolerance = {tolerance}
+sampling_factor = 1
+tadfactor = {tadfactor}
+mdsteps_rigid = {md_rigid}
+mdsteps_cool1 = {md_cool1}
+mdsteps_cool2 = {md_cool2}
+mdsteps_cool3 = {md_cool3}
+# Keep peptide fully flexible
+nfle = 1
+fle_sta_1 = 1
+fle_end_1 = {peptide_length}
+fle_seg_1 = "B"
+# Turn off electrostatic for final refinement
+elecflag = false
+
+# Final MD refinement in explicit water
+[mdref]
+watersteps = {water_steps}
+# Keep peptide fully flexible
+nfle = 1
+fle_sta_1 = 1
+fle_end_1 = {peptide_length}
+fle_seg_1 = "B"
+
+# Final evaluation
+[caprieval]
+
+# Final clustering
+[rmsdmatrix]
+
+[clustrmsd]
+criterion = "maxclust"  # Use maximum number of clusters
+n_clusters = {n_clusters}  # Number of desired clusters
+min_population = {min_population}  # Include singletons
+plot_matrix = true  # Plot the RMSD matrix
+
+# Select final top models
+[seletopclusts]
+top_clusters = {top_clusters}
+top_models = {top_models}
+
+# Final evaluation
+[caprieval]
+
+# ==================================================
+"""
+
+
+@dataclass(frozen=True)
+class CyclisationConfig:
+    """
+    Parameters of the cyclisation workflow, flattened from the nested JSON layout.
+
+    Frozen (and therefore hashable) so rendered configs can be cached per value.
+    """
+    ncores: int = 4
+    tolerance: int = 5
+    sampling_factor: int = 10
+    tadfactor: int = 4
+    md_rigid: int = 2000
+    md_cool1: int = 2000
+    md_cool2: int = 4000
+    md_cool3: int = 4000
+    n_clusters: int = 50
+    min_population: int = 1
+    top_clusters: int = 50
+    top_models: int = 1
+    cyclic_distance: float = 3.5
+    disulphide_distance: float = 4.0
+    water_steps: int = 5000
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> "CyclisationConfig":
+        """
+        Build from the nested dict used by DEFAULT_CONFIG and the JSON config files.
+
+        Keys that do not affect the rendered workflow (e.g. timeout) are ignored,
+        and missing keys fall back to the protocol defaults.
+        """
+        md = config.get("md_steps", {})
+        cluster = config.get("clustering", {})
+        cyclic = config.get("cyclisation", {})
+        values = {
+            "ncores": config.get("ncores"),
+            "tolerance": config.get("tolerance"),
+            "sampling_factor": config.get("sampling_factor"),
+            "tadfactor": config.get("tadfactor"),
+            "md_rigid": md.get("rigid"),
+            "md_cool1": md.get("cool1"),
+            "md_cool2": md.get("cool2"),
+            "md_cool3": md.get("cool3"),
+            "n_clusters": cluster.get("n_clusters"),
+            "min_population": cluster.get("min_population"),
+            "top_clusters": cluster.get("top_clusters"),
+            "top_models": cluster.get("top_models"),
+            "cyclic_distance": cyclic.get("distance"),
+            "disulphide_distance": cyclic.get("disulphide_distance"),
+            "water_steps": config.get("water_steps"),
+        }
+        return cls(**{k: v for k, v in values.items() if v is not None})
+
+
+@functools.lru_cache(maxsize=256)
+def _render_config(peptide_pdb: str, peptide_length: int, output_dir: str,
+                   cfg: CyclisationConfig) -> str:
+    """Render the cyclisation config; cached so parameter sweeps reuse identical configs."""
+    return _CYCLISATION_CONFIG_TEMPLATE.format(
+        peptide_pdb=peptide_pdb,
+        peptide_length=peptide_length,
+        output_dir=output_dir,
+        **asdict(cfg)
+    )
+
+
+def render_config(peptide_pdb: str, peptide_length: int, output_dir: str,
+                  config: Union[CyclisationConfig, Mapping[str, Any]]) -> str:
+    """
+    Create a HADDOCK3 configuration file for peptide cyclisation.
+
+    Args:
+        peptide_pdb: Path to the linear peptide PDB file
+        peptide_length: Number of residues in the peptide
+        output_dir: HADDOCK3 run directory name
+        config: CyclisationConfig, or a nested config mapping (missing keys
+            use protocol defaults)
+
+    Returns:
+        Configuration file content
+    """
+    if not isinstance(config, CyclisationConfig):
+        config = CyclisationConfig.from_dict(config)
+    return _render_config(peptide_pdb, peptide_length, output_dir, config)
+
+
+# Termini distance restraints; every %d is the C-terminal residue number
+_RESTRAINTS_TEMPLATE = (
+    b"!\n"
+    b"! Distance restraints for peptide cyclisation\n"
+    b"! These restraints bring the N and C termini together\n"
+    b"!\n"
+    b"! N-terminus (residue 1) to C-terminus (residue %d)\n"
+    b"assign (segid B and resid 1 and name N) (segid B and resid %d and name C) 1.4 0.2 0.2\n"
+    b"assign (segid B and resid 1 and name CA) (segid B and resid %d and name CA) 2.5 0.5 0.5\n"
+    b"assign (segid B and resid 1 and name CB) (segid B and resid %d and name CB) 3.5 1.0 1.0\n"
+)
+
+
+def write_restraints(peptide_length: int, output_file: Union[str, Path]) -> None:
+    """
+    Create distance restraints to bring N and C termini together for cyclisation.
+
+    Args:
+        peptide_length: Number of residues in the peptide
+        output_file: Path to output restraints file
+    """
+    Path(output_file).write_bytes(_RESTRAINTS_TEMPLATE % ((peptide_length,) * 4))
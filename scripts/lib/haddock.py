@@ -4,25 +4,78 @@ HADDOCK3 execution utilities for MCP scripts.
 Common functions for running HADDOCK3 and managing environments.
 """
 
+import os
 import subprocess
+from collections import deque
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
+
+
+# Environment next to the repository root (scripts/lib/ -> repo/env); fixed at import
+_SCRIPT_ENV = Path(__file__).resolve().parents[2] / "env"
+
+
+# Environment found by find_haddock_env, per working directory (the first
+# candidate is cwd-relative); only a path that existed is kept
+_found_env: Dict[str, Path] = {}
 
 
 def find_haddock_env() -> Path:
-    """Find the HADDOCK3 environment path."""
-    # Try current directory first
-    env_path = Path.cwd() / "env"
-    if env_path.exists():
-        return env_path
+    """
+    Find the HADDOCK3 environment path.
 
-    # Try relative to script directory
-    env_path = Path(__file__).parent.parent.parent / "env"
-    if env_path.exists():
-        return env_path
+    A found environment is remembered for later calls from the same working
+    directory. A failed lookup is not, so an environment created while the
+    process runs is picked up on the next call.
+    """
+    cwd = os.getcwd()
+    found = _found_env.get(cwd)
+    if found is not None:
+        return found
+
+    # Try current directory first, then relative to script directory
+    cwd_env = Path(cwd) / "env"
+    for env_path in (cwd_env, _SCRIPT_ENV):
+        if os.path.isdir(env_path):
+            _found_env[cwd] = env_path
+            return env_path
 
     # Default fallback
-    return Path.cwd() / "env"
+    return cwd_env
+
+
+def haddock3_command() -> Tuple[Tuple[str, ...], Optional[Dict[str, str]]]:
+    """
+    Resolve how to launch HADDOCK3.
+
+    The env's haddock3 binary is run directly (skipping the activation
+    overhead of `mamba run`) when present, otherwise `mamba run -p <env>`.
+    The subprocess env is built from the current os.environ on each call.
+
+    Returns:
+        tuple: (command prefix, subprocess env or None to inherit)
+    """
+    env_path = find_haddock_env()
+    haddock3 = env_path / "bin" / "haddock3"
+    if not os.path.isfile(haddock3):
+        return ("mamba", "run", "-p", str(env_path), "haddock3"), None
+
+    env = {
+        **os.environ,
+        "PATH": f"{env_path / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+        "CONDA_PREFIX": str(env_path),
+    }
+    return (str(haddock3),), env
+
+
+# Lines of each log echoed to the console when a run fails
+_FAILURE_TAIL_LINES = 200
+
+
+def _tail(log_file: Path, lines: int = _FAILURE_TAIL_LINES) -> str:
+    """Return the last lines of a log file without holding the whole file in memory."""
+    with open(log_file, errors="replace") as f:
+        return "".join(deque(f, maxlen=lines))
 
 
 def run_haddock3(config_file: Path, work_dir: Path, timeout: int = 3600,
@@ -30,6 +83,9 @@ def run_haddock3(config_file: Path, work_dir: Path, timeout: int = 3600,
     """
     Execute HADDOCK3 with the given configuration.
 
+    HADDOCK3's stdout and stderr are written to <description>.stdout.log and
+    <description>.stderr.log in work_dir.
+
     Args:
         config_file: Path to HADDOCK3 configuration file
         work_dir: Working directory for execution
@@ -43,32 +99,38 @@ def run_haddock3(config_file: Path, work_dir: Path, timeout: int = 3600,
         print(f"Running {description} with configuration: {config_file}")
         print("This may take several minutes to hours depending on the system size...")
 
-        # Find environment path
-        env_path = find_haddock_env()
+        command, env = haddock3_command()
 
-        # Run HADDOCK3
-        result = subprocess.run([
-            "mamba", "run", "-p", str(env_path),
-            "haddock3", str(config_file)
-        ],
-        cwd=work_dir,
-        capture_output=True,
-        text=True,
-        timeout=timeout
-        )
+        # Run HADDOCK3 with output going straight to log files rather than memory
+        log_stem = description.replace(" ", "_")
+        stdout_path = work_dir / f"{log_stem}.stdout.log"
+        stderr_path = work_dir / f"{log_stem}.stderr.log"
+        with open(stdout_path, 'wb') as stdout_fh, open(stderr_path, 'wb') as stderr_fh:
+            result = subprocess.run([
+                *command, str(config_file)
+            ],
+            cwd=work_dir,
+            env=env,
+            stdout=stdout_fh,
+            stderr=stderr_fh,
+            timeout=timeout
+            )
 
         if result.returncode == 0:
             print(f"{description} completed successfully!")
-            # Find the output directory
-            run_dirs = [d for d in work_dir.iterdir() if d.is_dir() and d.name.startswith("run")]
-            if run_dirs:
-                output_dir = run_dirs[0]  # Take the first run directory
+            # Find the output directory; DirEntry.is_dir() uses the cached d_type
+            with os.scandir(work_dir) as entries:
+                output_dir = next((Path(e.path) for e in entries
+                                   if e.name.startswith("run") and e.is_dir(follow_symlinks=False)), None)
+            if output_dir is not None:
                 print(f"Results available in: {output_dir}")
                 return True, output_dir
+            print(f"No run* output directory found in: {work_dir}")
+            return False, None
         else:
             print(f"{description} failed!")
-            print("STDOUT:", result.stdout)
-            print("STDERR:", result.stderr)
+            print(f"STDOUT (last {_FAILURE_TAIL_LINES} lines of {stdout_path}):", _tail(stdout_path))
+            print(f"STDERR (last {_FAILURE_TAIL_LINES} lines of {stderr_path}):", _tail(stderr_path))
             return False, None
 
     except subprocess.TimeoutExpired:
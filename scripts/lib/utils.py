@@ -6,7 +6,11 @@ Common helper functions used across multiple scripts.
 
 from pathlib import Path
 from typing import List, Dict, Any, Union
-import json
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; stdlib json.loads also accepts bytes
+    import json as _json
 
 
 def parse_residue_list(residue_string: str) -> List[int]:
@@ -25,6 +29,8 @@ def parse_residue_list(residue_string: str) -> List[int]:
     """
     if not residue_string:
         return []
+    # int() per token: keeps Python's parsing rules, error messages and
+    # arbitrary precision, which a NumPy int64 cast would not
     return [int(x.strip()) for x in residue_string.split(",") if x.strip()]
 
 
@@ -55,14 +61,17 @@ def load_config_file(config_file: Union[str, Path]) -> Dict[str, Any]:
 
     Raises:
         FileNotFoundError: If config file doesn't exist
-        json.JSONDecodeError: If config file is invalid JSON
+        json.JSONDecodeError: If config file is invalid JSON (orjson's error
+            subclasses it)
     """
     config_path = Path(config_file)
-    if not config_path.exists():
+    # Opening the file is the existence check; no separate stat beforehand
+    try:
+        data = config_path.read_bytes()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
-    with open(config_path) as f:
-        return json.load(f)
+    return _json.loads(data)
 
 
 def merge_configs(default_config: Dict[str, Any], user_config: Dict[str, Any],
@@ -78,17 +87,8 @@ def merge_configs(default_config: Dict[str, Any], user_config: Dict[str, Any],
     Returns:
         Merged configuration dictionary
     """
-    config = default_config.copy()
-
-    # Update with user config
-    if user_config:
-        config.update(user_config)
-
-    # Update with CLI overrides
-    if cli_overrides:
-        config.update(cli_overrides)
-
-    return config
+    # Single pre-sized merge; later sources win
+    return {**default_config, **(user_config or {}), **(cli_overrides or {})}
 
 
 def format_residue_string(residues: List[int]) -> str:
@@ -121,27 +121,21 @@ def summarize_result(result: Dict[str, Any], operation: str) -> str:
     Returns:
         Formatted summary string
     """
-    lines = [f"\n{operation} Summary:"]
-    lines.append("=" * (len(operation) + 9))
-
-    if result.get("success"):
-        lines.append("✅ Status: SUCCESS")
-        if result.get("output_dir"):
-            lines.append(f"📁 Results: {result['output_dir']}")
-    else:
-        lines.append("❌ Status: FAILED")
-
-    lines.append(f"⚙️  Config: {result.get('config_file', 'N/A')}")
-    lines.append(f"📂 Work Dir: {result.get('work_dir', 'N/A')}")
-
-    # Add specific information based on operation
-    if "restraints" in result:
-        if isinstance(result["restraints"], dict):
-            lines.append(f"🔗 Restraints: {len(result['restraints'])} files")
-        else:
-            lines.append(f"🔗 Restraints: {result['restraints']}")
-
-    if "peptide_length" in result:
-        lines.append(f"🧬 Peptide Length: {result['peptide_length']} residues")
-
-    return "\n".join(lines)
\ No newline at end of file
+    success = result.get("success")
+    restraints = result.get("restraints")
+    if isinstance(restraints, dict):
+        restraints = f"{len(restraints)} files"
+
+    # None entries mark lines that do not apply to this result
+    parts = [
+        f"\n{operation} Summary:",
+        "=" * (len(operation) + 9),
+        "✅ Status: SUCCESS" if success else "❌ Status: FAILED",
+        f"📁 Results: {result['output_dir']}" if success and result.get("output_dir") else None,
+        f"⚙️  Config: {result.get('config_file', 'N/A')}",
+        f"📂 Work Dir: {result.get('work_dir', 'N/A')}",
+        # Add specific information based on operation
+        f"🔗 Restraints: {restraints}" if "restraints" in result else None,
+        f"🧬 Peptide Length: {result['peptide_length']} residues" if "peptide_length" in result else None,
+    ]
+    return "\n".join(p for p in parts if p is not None)
\ No newline at end of file
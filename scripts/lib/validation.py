@@ -4,9 +4,23 @@ Input validation utilities for HADDOCK3 MCP scripts.
 Functions for validating input files and parameters.
 """
 
+import mmap
+import os
 from pathlib import Path
 from typing import List
 
+# Required extension per input type; new file types only need an entry here
+_EXT_BY_TYPE = {
+    "protein": ".pdb",
+    "peptide": ".pdb",
+    "pdb": ".pdb",
+    "restraints": ".tbl",
+}
+_EXT_DESCRIPTION = {
+    ".pdb": "PDB file",
+    ".tbl": "restraints file (.tbl)",
+}
+
 
 def validate_input_file(file_path: Path, file_type: str) -> bool:
     """
@@ -23,14 +37,15 @@ def validate_input_file(file_path: Path, file_type: str) -> bool:
         FileNotFoundError: If file doesn't exist
         ValueError: If file has wrong format
     """
-    if not file_path.exists():
+    # Plain string operations; no pathlib parsing on this per-submission path
+    path_str = str(file_path)
+    if not os.path.exists(path_str):
         raise FileNotFoundError(f"{file_type} file not found: {file_path}")
 
-    if file_type in ["protein", "peptide", "pdb"] and not file_path.suffix.lower() == ".pdb":
-        raise ValueError(f"Expected PDB file, got: {file_path.suffix}")
-
-    if file_type == "restraints" and not file_path.suffix.lower() == ".tbl":
-        raise ValueError(f"Expected restraints file (.tbl), got: {file_path.suffix}")
+    expected = _EXT_BY_TYPE.get(file_type)
+    if expected and not path_str.lower().endswith(expected):
+        ext = os.path.splitext(path_str)[1].lower()
+        raise ValueError(f"Expected {_EXT_DESCRIPTION[expected]}, got: {ext}")
 
     return True
 
@@ -49,15 +64,16 @@ def validate_pdb_format(pdb_file: Path) -> bool:
         ValueError: If PDB format is invalid
     """
     try:
-        with open(pdb_file, 'r') as f:
-            lines = f.readlines()
+        with open(pdb_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Empty PDB file: {pdb_file}")
 
-        if not lines:
-            raise ValueError(f"Empty PDB file: {pdb_file}")
+            # One ATOM/HETATM record is enough; stop at the first hit
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                has_atom = (mm[:4] == b'ATOM' or mm[:6] == b'HETATM'
+                            or mm.find(b'\nATOM') != -1 or mm.find(b'\nHETATM') != -1)
 
-        # Check for at least some ATOM records
-        atom_count = sum(1 for line in lines if line.startswith(('ATOM', 'HETATM')))
-        if atom_count == 0:
+        if not has_atom:
             raise ValueError(f"No ATOM records found in PDB file: {pdb_file}")
 
         return True
@@ -80,19 +96,22 @@ def get_peptide_length_from_pdb(pdb_file: Path) -> int:
         ValueError: If unable to determine length
     """
     try:
-        residue_numbers = set()
-        with open(pdb_file, 'r') as f:
+        # Only the highest residue number is needed, so keep a running max
+        max_res = None
+        with open(pdb_file, 'rb') as f:
             for line in f:
-                if line.startswith(('ATOM', 'HETATM')):
+                # Compare raw record names; no per-line decode is needed
+                if line[:4] == b'ATOM' or line[:6] == b'HETATM':
                     # Extract residue number (columns 23-26)
                     try:
-                        res_num = int(line[22:26].strip())
-                        residue_numbers.add(res_num)
+                        res_num = int(line[22:26])
                     except ValueError:
                         continue
+                    if max_res is None or res_num > max_res:
+                        max_res = res_num
 
-        if residue_numbers:
-            return max(residue_numbers)
+        if max_res is not None:
+            return max_res
         else:
             raise ValueError("No valid residues found in PDB file")
     except Exception as e:
@@ -116,4 +135,4 @@ def validate_residue_list(residues: List[int], max_residue: int) -> bool:
     for res in residues:
         if res < 1 or res > max_residue:
             raise ValueError(f"Residue number {res} out of range (1-{max_residue})")
-    return True
\ No newline at end of file
+    return True
@@ -6,7 +6,10 @@ All operations are long-running (30 minutes to 6 hours) and use the job manageme
 
 from fastmcp import FastMCP
 from pathlib import Path
-from typing import Optional, List
+from types import MappingProxyType
+from typing import Optional, List, Tuple
+import asyncio
+import os
 import sys
 
 # Setup paths
@@ -26,6 +29,82 @@ logger = logging.getLogger(__name__)
 # Create MCP server
 mcp = FastMCP("haddock3-cycpep")
 
+# Static server metadata, built once. Nested sections are read-only proxies and
+# tool lists are tuples, so nothing handed out by get_server_info can alter it.
+_SERVER_INFO = MappingProxyType({
+    "server_name": "haddock3-cycpep",
+    "version": "1.0.0",
+    "description": "MCP server for HADDOCK3 cyclic peptide molecular docking and cyclisation",
+    "available_tools": MappingProxyType({
+        "job_management": (
+            "get_job_status", "get_job_result", "get_job_log",
+            "cancel_job", "list_jobs"
+        ),
+        "docking_tools": (
+            "submit_protein_peptide_docking",
+            "submit_cyclic_peptide_cyclisation",
+            "submit_information_driven_docking"
+        ),
+        "batch_tools": (
+            "submit_batch_protein_peptide_docking",
+        ),
+        "utility_tools": (
+            "validate_haddock_environment",
+            "get_example_data_paths",
+            "get_server_info"
+        )
+    }),
+    "typical_runtimes": MappingProxyType({
+        "protein_peptide_docking": "1-4 hours",
+        "cyclic_peptide_cyclisation": "30-90 minutes",
+        "information_driven_docking": "1-6 hours"
+    }),
+    "requirements": MappingProxyType({
+        "haddock3": "Required for all docking operations",
+        "conda_environment": "./env or detected HADDOCK3 environment",
+        "minimum_cores": 4,
+        "recommended_memory": "8 GB RAM"
+    })
+})
+
+# ==============================================================================
+# Helpers
+# ==============================================================================
+
+def _check_exists(path_str: str, label: str) -> Optional[dict]:
+    """Return an error response if path_str does not exist (one raw stat, no Path)."""
+    try:
+        os.stat(path_str)
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        # ValueError (e.g. an embedded null byte) is "not found", as Path.exists() treated it
+        return {"status": "error", "error": f"{label} not found: {path_str}"}
+    return None
+
+async def _check_all_exist(*checks: Tuple[Optional[str], str]) -> Optional[dict]:
+    """
+    Stat (path, label) inputs concurrently in worker threads so submissions don't
+    serialise on disk latency. None paths are skipped; every missing file is
+    reported in a single error response.
+    """
+    pending = [(path, label) for path, label in checks if path]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_check_exists, path, label) for path, label in pending)
+    )
+    missing = [result["error"] for result in results if result]
+    if missing:
+        return {"status": "error", "error": "; ".join(missing)}
+    return None
+
+def _build_docking_args(protein_file: str, peptide_file: str, output_dir: Optional[str],
+                        restraints_file: Optional[str]) -> dict:
+    """Script arguments for a protein_peptide_docking.py job."""
+    return {
+        "input_protein": protein_file,
+        "input_peptide": peptide_file,
+        "output_dir": output_dir,
+        "restraints_file": restraints_file
+    }
+
 # ==============================================================================
 # Job Management Tools (for async operations)
 # ==============================================================================
@@ -102,7 +181,7 @@ def list_jobs(status: Optional[str] = None) -> dict:
 # ==============================================================================
 
 @mcp.tool()
-def submit_protein_peptide_docking(
+async def submit_protein_peptide_docking(
     protein_file: str,
     peptide_file: str,
     output_dir: Optional[str] = None,
@@ -131,26 +210,22 @@ def submit_protein_peptide_docking(
     script_path = str(SCRIPTS_DIR / "protein_peptide_docking.py")
 
     # Validate input files
-    if not Path(protein_file).exists():
-        return {"status": "error", "error": f"Protein file not found: {protein_file}"}
-    if not Path(peptide_file).exists():
-        return {"status": "error", "error": f"Peptide file not found: {peptide_file}"}
-    if restraints_file and not Path(restraints_file).exists():
-        return {"status": "error", "error": f"Restraints file not found: {restraints_file}"}
+    error = await _check_all_exist(
+        (protein_file, "Protein file"),
+        (peptide_file, "Peptide file"),
+        (restraints_file, "Restraints file")
+    )
+    if error:
+        return error
 
     return job_manager.submit_job(
         script_path=script_path,
-        args={
-            "input_protein": protein_file,
-            "input_peptide": peptide_file,
-            "output_dir": output_dir,
-            "restraints_file": restraints_file
-        },
+        args=_build_docking_args(protein_file, peptide_file, output_dir, restraints_file),
         job_name=job_name or f"protein_peptide_docking_{Path(peptide_file).stem}"
     )
 
 @mcp.tool()
-def submit_cyclic_peptide_cyclisation(
+async def submit_cyclic_peptide_cyclisation(
     peptide_file: str,
     peptide_length: Optional[int] = None,
     output_dir: Optional[str] = None,
@@ -174,8 +249,9 @@ def submit_cyclic_peptide_cyclisation(
     script_path = str(SCRIPTS_DIR / "cyclic_peptide_cyclisation.py")
 
     # Validate input file
-    if not Path(peptide_file).exists():
-        return {"status": "error", "error": f"Peptide file not found: {peptide_file}"}
+    error = await _check_all_exist((peptide_file, "Peptide file"))
+    if error:
+        return error
 
     return job_manager.submit_job(
         script_path=script_path,
@@ -188,7 +264,7 @@ def submit_cyclic_peptide_cyclisation(
     )
 
 @mcp.tool()
-def submit_information_driven_docking(
+async def submit_information_driven_docking(
     protein_file: str,
     peptide_file: str,
     active_protein_residues: Optional[str] = None,
@@ -220,10 +296,12 @@ def submit_information_driven_docking(
     script_path = str(SCRIPTS_DIR / "information_driven_docking.py")
 
     # Validate input files
-    if not Path(protein_file).exists():
-        return {"status": "error", "error": f"Protein file not found: {protein_file}"}
-    if not Path(peptide_file).exists():
-        return {"status": "error", "error": f"Peptide file not found: {peptide_file}"}
+    error = await _check_all_exist(
+        (protein_file, "Protein file"),
+        (peptide_file, "Peptide file")
+    )
+    if error:
+        return error
 
     # Validate that at least some restraint information is provided
     if not any([active_protein_residues, active_peptide_residues,
@@ -252,7 +330,7 @@ def submit_information_driven_docking(
 # ==============================================================================
 
 @mcp.tool()
-def submit_batch_protein_peptide_docking(
+async def submit_batch_protein_peptide_docking(
     protein_file: str,
     peptide_files: List[str],
     restraints_file: Optional[str] = None,
@@ -275,30 +353,39 @@ def submit_batch_protein_peptide_docking(
     Returns:
         Dictionary with list of submitted job_ids
     """
-    if not Path(protein_file).exists():
-        return {"status": "error", "error": f"Protein file not found: {protein_file}"}
+    # Shared inputs are checked once for the whole batch
+    error = await _check_all_exist(
+        (protein_file, "Protein file"),
+        (restraints_file, "Restraints file")
+    )
+    if error:
+        return error
 
+    script_path = str(SCRIPTS_DIR / "protein_peptide_docking.py")
     job_ids = []
     errors = []
 
-    for i, peptide_file in enumerate(peptide_files):
-        if not Path(peptide_file).exists():
-            errors.append(f"Peptide file not found: {peptide_file}")
+    # Stat all peptide files concurrently; gather() keeps the input order
+    peptide_errors = await asyncio.gather(
+        *(asyncio.to_thread(_check_exists, p, "Peptide file") for p in peptide_files)
+    )
+
+    for i, (peptide_file, error) in enumerate(zip(peptide_files, peptide_errors)):
+        if error:
+            errors.append(error["error"])
             continue
 
         # Create output directory for this peptide
         peptide_name = Path(peptide_file).stem
         if output_base_dir:
-            output_dir = Path(output_base_dir) / f"docking_{peptide_name}"
+            output_dir = str(Path(output_base_dir) / f"docking_{peptide_name}")
         else:
             output_dir = None
 
-        # Submit individual job
-        result = submit_protein_peptide_docking(
-            protein_file=protein_file,
-            peptide_file=peptide_file,
-            output_dir=str(output_dir) if output_dir else None,
-            restraints_file=restraints_file,
+        # Submit individual job (inputs are already validated above)
+        result = job_manager.submit_job(
+            script_path=script_path,
+            args=_build_docking_args(protein_file, peptide_file, output_dir, restraints_file),
             job_name=f"{job_name or 'batch'}_{i+1}_{peptide_name}"
         )
 
@@ -371,14 +458,21 @@ def get_example_data_paths() -> dict:
         "other_files": []
     }
 
-    if examples_dir.exists():
-        for file_path in examples_dir.glob("*.pdb"):
-            if "protein" in file_path.name.lower():
-                example_files["protein_structures"].append(str(file_path))
-            elif "peptide" in file_path.name.lower() or any(x in file_path.name for x in ["sfi", "DAID"]):
-                example_files["peptide_structures"].append(str(file_path))
-            else:
-                example_files["other_files"].append(str(file_path))
+    try:
+        with os.scandir(examples_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".pdb"):
+                    continue
+                low = name.lower()
+                if "protein" in low:
+                    example_files["protein_structures"].append(entry.path)
+                elif "peptide" in low or "sfi" in name or "DAID" in name:
+                    example_files["peptide_structures"].append(entry.path)
+                else:
+                    example_files["other_files"].append(entry.path)
+    except FileNotFoundError:
+        pass
 
     return {
         "status": "success",
@@ -395,40 +489,10 @@ def get_server_info() -> dict:
     Returns:
         Dictionary with server capabilities and tool descriptions
     """
+    # Fresh top-level dicts per call; the tuples and strings inside are immutable
     return {
-        "server_name": "haddock3-cycpep",
-        "version": "1.0.0",
-        "description": "MCP server for HADDOCK3 cyclic peptide molecular docking and cyclisation",
-        "available_tools": {
-            "job_management": [
-                "get_job_status", "get_job_result", "get_job_log",
-                "cancel_job", "list_jobs"
-            ],
-            "docking_tools": [
-                "submit_protein_peptide_docking",
-                "submit_cyclic_peptide_cyclisation",
-                "submit_information_driven_docking"
-            ],
-            "batch_tools": [
-                "submit_batch_protein_peptide_docking"
-            ],
-            "utility_tools": [
-                "validate_haddock_environment",
-                "get_example_data_paths",
-                "get_server_info"
-            ]
-        },
-        "typical_runtimes": {
-            "protein_peptide_docking": "1-4 hours",
-            "cyclic_peptide_cyclisation": "30-90 minutes",
-            "information_driven_docking": "1-6 hours"
-        },
-        "requirements": {
-            "haddock3": "Required for all docking operations",
-            "conda_environment": "./env or detected HADDOCK3 environment",
-            "minimum_cores": 4,
-            "recommended_memory": "8 GB RAM"
-        }
+        key: dict(value) if isinstance(value, MappingProxyType) else value
+        for key, value in _SERVER_INFO.items()
     }
 
 # ==============================================================================